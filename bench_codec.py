@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import time
+
+from bm_codec import CODECS, get_codec
+
+# 用法: python bench_codec.py [记录的响应文件或目录 ...]
+# 每个文件是一条JSON格式的JSON-RPC响应，可以通过设置 BM_RECORD_DIR 运行 bm_client.py（包含页面快照）
+# 或 bm7.py 录制，例如:
+#   BM_RECORD_DIR=recordings python bm_client.py && python bench_codec.py recordings
+# 未提供文件时使用一份合成的页面快照响应（约数百KB）作为样本。
+# 对比MessagePack需要先安装msgpack包: pip install msgpack，否则只测量JSON。
+
+ITERATIONS = 50
+
+
+def load_samples(paths):
+    """加载记录的工具调用结果"""
+    samples = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".json")]
+        else:
+            files = [path]
+        for file in files:
+            with open(file, "r", encoding="utf-8") as f:
+                samples.append((os.path.basename(file), json.load(f)))
+    return samples
+
+
+def synthetic_snapshot(lines=6000):
+    """构造一条与 browser_snapshot 结果结构相同的响应"""
+    yaml_lines = [f'- link "页面链接 {i} / Page link {i}" [ref=s1e{i}]' for i in range(lines)]
+    text = "- Page URL: https://www.example.com/\n- Page Title: Example Domain\n- Page Snapshot\n```yaml\n"
+    text += "\n".join(yaml_lines) + "\n```\n"
+    return {
+        "jsonrpc": "2.0",
+        "id": "00000000-0000-0000-0000-000000000000",
+        "result": {"content": [{"type": "text", "text": text}]},
+    }
+
+
+def bench(codec, message, iterations=ITERATIONS):
+    """返回 (编码后字节数, 平均编码耗时ms, 平均解码耗时ms)"""
+    data = codec.encode(message)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.encode(message)
+    encode_ms = (time.perf_counter() - start) * 1000 / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(data)
+    decode_ms = (time.perf_counter() - start) * 1000 / iterations
+
+    size = len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+    return size, encode_ms, decode_ms
+
+
+def main():
+    samples = load_samples(sys.argv[1:]) or [("synthetic_snapshot", synthetic_snapshot())]
+
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError as e:
+            print(f"跳过 {name}: {e}")
+
+    print(f"{'样本':<28}{'编解码器':<10}{'字节数':>12}{'编码(ms)':>12}{'解码(ms)':>12}")
+    for sample_name, message in samples:
+        for codec in codecs:
+            size, encode_ms, decode_ms = bench(codec, message)
+            print(f"{sample_name:<28}{codec.name:<10}{size:>12}{encode_ms:>12.3f}{decode_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
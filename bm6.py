@@ -1,12 +1,17 @@
 import asyncio
 import websockets
-import json
+import os
+
+from bm_codec import codec_for_subprotocol, decode_frame, get_codec
 
 async def test_browser_navigate():
     uri = "ws://localhost:9009/ws"
+    # 通过环境变量 BM_CODEC 选择编解码器（json 或 msgpack），默认 json
+    requested_codec = get_codec(os.environ.get("BM_CODEC", "json"))
     try:
-        async with websockets.connect(uri) as websocket:
-            print("WebSocket 连接成功！")
+        async with websockets.connect(uri, subprotocols=[requested_codec.subprotocol]) as websocket:
+            codec = codec_for_subprotocol(websocket.subprotocol)
+            print(f"WebSocket 连接成功！编解码器: {codec.name}")
 
             # 构造调用 browser_navigate 的 JSON-RPC 消息
             request = {
@@ -20,11 +25,11 @@ async def test_browser_navigate():
                     }
                 }
             }
-            await websocket.send(json.dumps(request))
+            await websocket.send(codec.encode(request))
             print("已发送 browser_navigate 请求")
 
             # 等待服务器响应
-            response = await websocket.recv()
+            response = decode_frame(codec, await websocket.recv())
             print("收到服务器响应：", response)
 
     except Exception as e:
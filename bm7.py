@@ -1,12 +1,21 @@
 import asyncio
 import websockets
 import json
+import os
+import time
+
+from bm_codec import codec_for_subprotocol, decode_frame, get_codec
 
 async def test_browser_navigate():
     uri = "ws://localhost:9009/ws"
+    # 通过环境变量 BM_CODEC 选择编解码器（json 或 msgpack），默认 json
+    requested_codec = get_codec(os.environ.get("BM_CODEC", "json"))
+    # 设置环境变量 BM_RECORD_DIR 时，将解码后的响应保存为JSON文件，供 bench_codec.py 使用
+    record_dir = os.environ.get("BM_RECORD_DIR")
     try:
-        async with websockets.connect(uri) as websocket:
-            print("WebSocket 连接成功！")
+        async with websockets.connect(uri, subprotocols=[requested_codec.subprotocol]) as websocket:
+            codec = codec_for_subprotocol(websocket.subprotocol)
+            print(f"WebSocket 连接成功！编解码器: {codec.name}")
 
             request = {
                 "jsonrpc": "2.0",
@@ -19,14 +28,20 @@ async def test_browser_navigate():
                     }
                 }
             }
-            await websocket.send(json.dumps(request))
+            await websocket.send(codec.encode(request))
             print("已发送 browser_navigate 请求")
 
-            response = await websocket.recv()
-            print("收到服务器响应：", response)
+            resp = decode_frame(codec, await websocket.recv())
+            print("收到服务器响应：", resp)
+
+            if record_dir:
+                os.makedirs(record_dir, exist_ok=True)
+                record_path = os.path.join(record_dir, f"browser_navigate_{int(time.time() * 1000)}.json")
+                with open(record_path, "w", encoding="utf-8") as f:
+                    json.dump(resp, f, ensure_ascii=False)
+                print("已保存响应：", record_path)
 
             # 自动判断是否成功
-            resp = json.loads(response)
             if "result" in resp:
                 print("调用成功，返回内容：", resp["result"])
             elif "error" in resp:
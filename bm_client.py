@@ -8,6 +8,8 @@ import threading
 import uuid
 import logging
 
+from bm_codec import JsonCodec, codec_for_subprotocol, decode_frame, get_codec
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -15,8 +17,13 @@ logger = logging.getLogger(__name__)
 class MCPClient:
     """MCP客户端，用于与Model Context Protocol服务器通信"""
     
-    def __init__(self, server_process=None):
+    def __init__(self, server_process=None, codec="json", record_dir=None):
         self.server_process = server_process
+        # 设置后将每条响应保存为JSON文件，供 bench_codec.py 使用
+        self.record_dir = record_dir
+        # 请求的编解码器，实际使用的编解码器在连接建立后根据协商结果确定
+        self.requested_codec = get_codec(codec)
+        self.codec = JsonCodec()
         self.ws = None
         self.connected = False
         self.message_queue = {}
@@ -24,9 +31,21 @@ class MCPClient:
     
     def connect(self, url="ws://localhost:9009/ws"):
         """连接到MCP服务器"""
+        # JSON不协商子协议，以兼容不支持子协议协商的服务器
+        subprotocols = [self.requested_codec.subprotocol] if self.requested_codec.binary else None
+        if self._connect(url, subprotocols):
+            return True
+        if subprotocols:
+            logger.warning(f"服务器未接受{self.requested_codec.subprotocol}子协议，使用JSON重新连接")
+            return self._connect(url, None)
+        return False
+    
+    def _connect(self, url, subprotocols):
+        """建立一次WebSocket连接"""
         try:
             self.ws = websocket.WebSocketApp(
                 url,
+                subprotocols=subprotocols,
                 on_open=lambda ws: self._on_open(ws),
                 on_message=lambda ws, msg: self._on_message(ws, msg),
                 on_error=lambda ws, error: self._on_error(ws, error),
@@ -39,11 +58,11 @@ class MCPClient:
             # 等待连接建立
             timeout = 10
             start_time = time.time()
-            while not self.connected and time.time() - start_time < timeout:
+            while not self.connected and self.ws_thread.is_alive() and time.time() - start_time < timeout:
                 time.sleep(0.1)
             
             if not self.connected:
-                logger.error("连接MCP服务器超时")
+                logger.error("连接MCP服务器失败" if not self.ws_thread.is_alive() else "连接MCP服务器超时")
                 return False
                 
             logger.info("已连接到MCP服务器")
@@ -55,12 +74,16 @@ class MCPClient:
     def _on_open(self, ws):
         """WebSocket连接打开时的回调"""
         logger.info("WebSocket连接已打开")
+        subprotocol = ws.sock.handshake_response.subprotocol if ws.sock and ws.sock.handshake_response else None
+        self.codec = codec_for_subprotocol(subprotocol)
+        if self.codec.name != self.requested_codec.name:
+            logger.warning(f"服务器不支持{self.requested_codec.name}编解码器，回退到{self.codec.name}")
         self.connected = True
     
     def _on_message(self, ws, message):
         """接收到WebSocket消息时的回调"""
         try:
-            data = json.loads(message)
+            data = decode_frame(self.codec, message)
             logger.debug(f"收到消息: {data}")
             
             # 处理响应
@@ -95,7 +118,8 @@ class MCPClient:
         try:
             # 发送请求
             self.message_queue[message_id] = None
-            self.ws.send(json.dumps(request))
+            opcode = websocket.ABNF.OPCODE_BINARY if self.codec.binary else websocket.ABNF.OPCODE_TEXT
+            self.ws.send(self.codec.encode(request), opcode=opcode)
             
             # 等待响应
             start_time = time.time()
@@ -107,6 +131,9 @@ class MCPClient:
                 logger.error(f"请求超时: {method}")
                 return None
             
+            if self.record_dir:
+                self._record(method, params, response)
+            
             if "error" in response:
                 logger.error(f"请求错误: {response['error']}")
                 return None
@@ -116,6 +143,15 @@ class MCPClient:
             logger.error(f"发送请求时出错: {str(e)}")
             return None
     
+    def _record(self, method, params, response):
+        """将响应保存为JSON文件"""
+        name = (params or {}).get("name", method)
+        os.makedirs(self.record_dir, exist_ok=True)
+        record_path = os.path.join(self.record_dir, f"{name}_{int(time.time() * 1000)}.json")
+        with open(record_path, "w", encoding="utf-8") as f:
+            json.dump(response, f, ensure_ascii=False)
+        logger.info(f"已保存响应: {record_path}")
+    
     def list_tools(self):
         """列出可用工具"""
         return self.send_request("listTools")
@@ -218,7 +254,12 @@ def main():
     time.sleep(5)
     
     # 创建MCP客户端
-    client = MCPClient(server_process)
+    # 通过环境变量 BM_CODEC 选择编解码器（json 或 msgpack），BM_RECORD_DIR 指定响应保存目录
+    client = MCPClient(
+        server_process,
+        codec=os.environ.get("BM_CODEC", "json"),
+        record_dir=os.environ.get("BM_RECORD_DIR")
+    )
     
     try:
         # 连接到MCP服务器
@@ -0,0 +1,66 @@
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class JsonCodec:
+    """JSON编解码器（默认），使用文本帧"""
+
+    name = "json"
+    subprotocol = "mcp.json"
+    binary = False
+
+    def encode(self, message):
+        return json.dumps(message)
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """MessagePack编解码器，使用二进制帧"""
+
+    name = "msgpack"
+    subprotocol = "mcp.msgpack"
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("使用MessagePack编解码器需要先安装msgpack包: pip install msgpack")
+
+    def encode(self, message):
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+CODECS = {
+    JsonCodec.name: JsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+}
+
+
+def get_codec(name="json"):
+    """按名称创建编解码器"""
+    if name not in CODECS:
+        raise ValueError(f"未知的编解码器: {name}，可选: {', '.join(CODECS)}")
+    return CODECS[name]()
+
+
+def codec_for_subprotocol(subprotocol):
+    """根据服务器协商结果选择编解码器，未协商时回退到JSON"""
+    for codec_cls in CODECS.values():
+        if codec_cls.subprotocol == subprotocol:
+            return codec_cls()
+    return JsonCodec()
+
+
+def decode_frame(codec, data):
+    """解码一帧消息：文本帧始终按JSON解析，二进制帧使用协商的编解码器"""
+    if isinstance(data, str):
+        return json.loads(data)
+    return codec.decode(data)
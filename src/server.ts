@@ -9,6 +9,7 @@ import {
 import { Context } from "@/context";
 import type { Resource } from "@/resources/resource";
 import type { Tool } from "@/tools/tool";
+import { codecForSubprotocol, withCodec } from "@/utils/codec";
 import { createWebSocketServer } from "@/ws";
 
 type Options = {
@@ -37,7 +38,7 @@ export async function createServerWithTools(options: Options): Promise<Server> {
     if (context.hasWs()) {
       context.ws.close();
     }
-    context.ws = websocket;
+    context.ws = withCodec(websocket, codecForSubprotocol(websocket.protocol));
   });
 
   server.setRequestHandler(ListToolsRequestSchema, async () => {
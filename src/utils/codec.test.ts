@@ -0,0 +1,106 @@
+import { EventEmitter } from "node:events";
+import type { WebSocket } from "ws";
+import { describe, expect, it } from "vitest";
+
+import {
+  codecForSubprotocol,
+  jsonCodec,
+  msgpackCodec,
+  negotiateSubprotocol,
+  withCodec,
+} from "./codec";
+
+const message = {
+  jsonrpc: "2.0",
+  id: "1",
+  result: { content: [{ type: "text", text: '- link "示例" [ref=s1e1]' }] },
+};
+
+class FakeSocket extends EventEmitter {
+  sent: unknown[] = [];
+
+  send(data: unknown) {
+    this.sent.push(data);
+  }
+}
+
+describe("negotiateSubprotocol", () => {
+  it("picks the first supported subprotocol", () => {
+    expect(negotiateSubprotocol(new Set(["mcp.xml", "mcp.msgpack"]))).toBe(
+      "mcp.msgpack",
+    );
+    expect(negotiateSubprotocol(new Set(["mcp.json", "mcp.msgpack"]))).toBe(
+      "mcp.json",
+    );
+  });
+
+  it("rejects unknown subprotocols", () => {
+    expect(negotiateSubprotocol(new Set(["mcp.xml"]))).toBe(false);
+  });
+});
+
+describe("codecForSubprotocol", () => {
+  it("falls back to JSON", () => {
+    expect(codecForSubprotocol("")).toBe(jsonCodec);
+    expect(codecForSubprotocol("mcp.xml")).toBe(jsonCodec);
+    expect(codecForSubprotocol("mcp.msgpack")).toBe(msgpackCodec);
+  });
+});
+
+describe("codecs", () => {
+  it("round-trips JSON", () => {
+    const data = jsonCodec.encode(message) as string;
+    expect(jsonCodec.decode(Buffer.from(data))).toEqual(message);
+  });
+
+  it("round-trips MessagePack", () => {
+    const data = msgpackCodec.encode(message) as Uint8Array;
+    expect(msgpackCodec.decode(Buffer.from(data))).toEqual(message);
+  });
+});
+
+describe("withCodec", () => {
+  it("returns JSON sockets unwrapped", () => {
+    const ws = new FakeSocket() as unknown as WebSocket;
+    expect(withCodec(ws, jsonCodec)).toBe(ws);
+  });
+
+  it("re-encodes outgoing JSON text with the negotiated codec", () => {
+    const fake = new FakeSocket();
+    const ws = withCodec(fake as unknown as WebSocket, msgpackCodec);
+    ws.send(JSON.stringify(message));
+    expect(msgpackCodec.decode(Buffer.from(fake.sent[0] as Uint8Array))).toEqual(
+      message,
+    );
+  });
+
+  it("hands incoming binary frames to listeners as JSON text", () => {
+    const fake = new FakeSocket();
+    const ws = withCodec(fake as unknown as WebSocket, msgpackCodec);
+    const received: [string, boolean][] = [];
+    const listener = (data: Buffer, isBinary: boolean) =>
+      received.push([data.toString("utf8"), isBinary]);
+    ws.on("message", listener);
+
+    const frame = Buffer.from(msgpackCodec.encode(message) as Uint8Array);
+    fake.emit("message", frame, true);
+    expect(received).toEqual([[JSON.stringify(message), false]]);
+
+    ws.off("message", listener);
+    expect(fake.listenerCount("message")).toBe(0);
+  });
+
+  it("wraps onmessage handlers", () => {
+    const fake = new FakeSocket() as FakeSocket & { onmessage?: unknown };
+    const ws = withCodec(fake as unknown as WebSocket, msgpackCodec);
+    const received: unknown[] = [];
+    ws.onmessage = (event) => received.push(event.data);
+
+    const frame = Buffer.from(msgpackCodec.encode(message) as Uint8Array);
+    (fake.onmessage as (event: { type: string; data: unknown }) => void)({
+      type: "message",
+      data: frame,
+    });
+    expect(received).toEqual([JSON.stringify(message)]);
+  });
+});
@@ -0,0 +1,169 @@
+import {
+  decode as msgpackDecode,
+  encode as msgpackEncode,
+} from "@msgpack/msgpack";
+import type { RawData, WebSocket } from "ws";
+
+/**
+ * Wire format for a WebSocket connection, negotiated through the
+ * `Sec-WebSocket-Protocol` header. JSON is used whenever the client does not
+ * ask for anything else.
+ */
+export type Codec = {
+  subprotocol: string;
+  binary: boolean;
+  encode: (message: unknown) => string | Uint8Array;
+  decode: (data: RawData) => unknown;
+};
+
+function toBuffer(data: RawData): Buffer {
+  if (Buffer.isBuffer(data)) {
+    return data;
+  }
+  if (Array.isArray(data)) {
+    return Buffer.concat(data);
+  }
+  return Buffer.from(data);
+}
+
+export const jsonCodec: Codec = {
+  subprotocol: "mcp.json",
+  binary: false,
+  encode: (message) => JSON.stringify(message),
+  decode: (data) => JSON.parse(toBuffer(data).toString("utf8")),
+};
+
+export const msgpackCodec: Codec = {
+  subprotocol: "mcp.msgpack",
+  binary: true,
+  encode: (message) => msgpackEncode(message),
+  decode: (data) => msgpackDecode(toBuffer(data)),
+};
+
+export const codecs: Codec[] = [jsonCodec, msgpackCodec];
+
+/**
+ * Picks the first subprotocol offered by the client that we have a codec for
+ */
+export function negotiateSubprotocol(protocols: Set<string>): string | false {
+  for (const protocol of protocols) {
+    if (codecs.some((codec) => codec.subprotocol === protocol)) {
+      return protocol;
+    }
+  }
+  return false;
+}
+
+export function codecForSubprotocol(protocol: string): Codec {
+  return codecs.find((codec) => codec.subprotocol === protocol) ?? jsonCodec;
+}
+
+type Listener = (...args: any[]) => void;
+
+/**
+ * Wraps a socket so that a JSON-framed message sender can talk over a
+ * connection that negotiated a binary codec: outgoing JSON text is re-encoded
+ * with `codec`, and incoming binary frames are decoded and handed to listeners
+ * as JSON text frames. JSON connections are returned unwrapped.
+ *
+ * The message sender does its own JSON framing, so on the server this only
+ * saves wire bytes and client-side decode time, not server CPU: every binary
+ * message is transcoded through JSON once more. Create the wrapper once per
+ * connection.
+ */
+export function withCodec(ws: WebSocket, codec: Codec): WebSocket {
+  if (!codec.binary) {
+    return ws;
+  }
+
+  const toJsonText = (data: RawData) =>
+    Buffer.from(JSON.stringify(codec.decode(data)), "utf8");
+
+  const wrapped = new WeakMap<Listener, Listener>();
+  const wrap = (listener: Listener, wrapper: Listener) => {
+    if (!wrapped.has(listener)) {
+      wrapped.set(listener, wrapper);
+    }
+    return wrapped.get(listener)!;
+  };
+  const wrapMessageListener = (listener: Listener) =>
+    wrap(listener, (data: RawData, isBinary: boolean) =>
+      listener(isBinary ? toJsonText(data) : data, false),
+    );
+  const wrapMessageEventListener = (listener: Listener) =>
+    wrap(listener, (event: { type: string; data: unknown }) =>
+      listener(
+        typeof event.data === "string"
+          ? event
+          : {
+              type: event.type,
+              target: proxy,
+              data: toJsonText(event.data as RawData).toString("utf8"),
+            },
+      ),
+    );
+
+  const proxy: WebSocket = new Proxy(ws, {
+    get(target, prop) {
+      switch (prop) {
+        case "send":
+          return (data: unknown, ...rest: any[]) =>
+            (target.send as Listener)(
+              typeof data === "string" ? codec.encode(JSON.parse(data)) : data,
+              ...rest,
+            );
+        case "on":
+        case "once":
+        case "addListener":
+        case "prependListener":
+        case "prependOnceListener":
+          return (event: string, listener: Listener) => {
+            (target[prop] as Listener)(
+              event,
+              event === "message" ? wrapMessageListener(listener) : listener,
+            );
+            return proxy;
+          };
+        case "off":
+        case "removeListener":
+          return (event: string, listener: Listener) => {
+            (target[prop] as Listener)(
+              event,
+              event === "message"
+                ? (wrapped.get(listener) ?? listener)
+                : listener,
+            );
+            return proxy;
+          };
+        case "addEventListener":
+          return (event: string, listener: Listener, options?: unknown) =>
+            (target.addEventListener as Listener)(
+              event,
+              event === "message"
+                ? wrapMessageEventListener(listener)
+                : listener,
+              options,
+            );
+        case "removeEventListener":
+          return (event: string, listener: Listener) =>
+            (target.removeEventListener as Listener)(
+              event,
+              event === "message"
+                ? (wrapped.get(listener) ?? listener)
+                : listener,
+            );
+      }
+      const value = Reflect.get(target, prop, target);
+      return typeof value === "function" ? value.bind(target) : value;
+    },
+    set(target, prop, value) {
+      if (prop === "onmessage") {
+        target.onmessage =
+          typeof value === "function" ? wrapMessageEventListener(value) : value;
+        return true;
+      }
+      return Reflect.set(target, prop, value, target);
+    },
+  });
+  return proxy;
+}
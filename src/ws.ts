@@ -3,6 +3,7 @@ import { WebSocketServer } from "ws";
 import { mcpConfig } from "@repo/config/mcp.config";
 import { wait } from "@repo/utils";
 
+import { negotiateSubprotocol } from "@/utils/codec";
 import { isPortInUse, killProcessOnPort } from "@/utils/port";
 
 export async function createWebSocketServer(
@@ -13,5 +14,5 @@ export async function createWebSocketServer(
   while (await isPortInUse(port)) {
     await wait(100);
   }
-  return new WebSocketServer({ port });
+  return new WebSocketServer({ port, handleProtocols: negotiateSubprotocol });
 }
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+
+import bm_codec
+from bm_codec import JsonCodec, MsgpackCodec, codec_for_subprotocol, decode_frame, get_codec
+
+MESSAGE = {
+    "jsonrpc": "2.0",
+    "id": "1",
+    "result": {"content": [{"type": "text", "text": "- link \"示例\" [ref=s1e1]"}], "isError": False},
+}
+
+
+def test_get_codec_unknown_name():
+    with pytest.raises(ValueError):
+        get_codec("xml")
+
+
+def test_codec_for_subprotocol_falls_back_to_json():
+    assert isinstance(codec_for_subprotocol(None), JsonCodec)
+    assert isinstance(codec_for_subprotocol("mcp.unknown"), JsonCodec)
+    assert isinstance(codec_for_subprotocol("mcp.json"), JsonCodec)
+
+
+def test_json_round_trip():
+    codec = get_codec("json")
+    data = codec.encode(MESSAGE)
+    assert isinstance(data, str)
+    assert decode_frame(codec, data) == MESSAGE
+
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    codec = get_codec("msgpack")
+    assert isinstance(codec_for_subprotocol("mcp.msgpack"), MsgpackCodec)
+    data = codec.encode(MESSAGE)
+    assert isinstance(data, bytes)
+    assert decode_frame(codec, data) == MESSAGE
+
+
+def test_decode_frame_text_frame_is_json_under_msgpack():
+    pytest.importorskip("msgpack")
+    codec = get_codec("msgpack")
+    assert decode_frame(codec, JsonCodec().encode(MESSAGE)) == MESSAGE
+
+
+def test_msgpack_codec_requires_msgpack(monkeypatch):
+    monkeypatch.setattr(bm_codec, "msgpack", None)
+    with pytest.raises(ImportError):
+        MsgpackCodec()
+    with pytest.raises(ImportError):
+        get_codec("msgpack")
+
+
+def fake_ws(subprotocol):
+    return SimpleNamespace(sock=SimpleNamespace(handshake_response=SimpleNamespace(subprotocol=subprotocol)))
+
+
+def test_client_on_open_uses_negotiated_codec():
+    pytest.importorskip("msgpack")
+    bm_client = pytest.importorskip("bm_client")
+    client = bm_client.MCPClient(codec="msgpack")
+    client._on_open(fake_ws("mcp.msgpack"))
+    assert client.connected
+    assert isinstance(client.codec, MsgpackCodec)
+
+
+def test_client_on_open_falls_back_to_json():
+    pytest.importorskip("msgpack")
+    bm_client = pytest.importorskip("bm_client")
+    client = bm_client.MCPClient(codec="msgpack")
+    client._on_open(fake_ws(None))
+    assert client.connected
+    assert isinstance(client.codec, JsonCodec)
+
+
+def test_client_json_does_not_offer_subprotocol(monkeypatch):
+    bm_client = pytest.importorskip("bm_client")
+    calls = []
+    client = bm_client.MCPClient()
+    monkeypatch.setattr(client, "_connect", lambda url, subprotocols: calls.append(subprotocols) or False)
+    assert not client.connect()
+    assert calls == [None]
+
+
+def test_client_msgpack_retries_without_subprotocol(monkeypatch):
+    pytest.importorskip("msgpack")
+    bm_client = pytest.importorskip("bm_client")
+    calls = []
+    client = bm_client.MCPClient(codec="msgpack")
+    monkeypatch.setattr(client, "_connect", lambda url, subprotocols: calls.append(subprotocols) or subprotocols is None)
+    assert client.connect()
+    assert calls == [["mcp.msgpack"], None]